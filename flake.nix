@@ -17,6 +17,10 @@
           ${builtins.readFile ./scripts/asar_tool.py}
         '';
 
+        # Background latest-version resolver used by the auto-update wrapper
+        updateCheck = pkgs.writeText "update_check.py"
+          (builtins.readFile ./scripts/update_check.py);
+
         # Cowork patches as derivations
         coworkPatches = pkgs.stdenv.mkDerivation {
           name = "claude-cowork-patches";
@@ -185,12 +189,13 @@
 
           runtimeInputs = with pkgs; [
             bubblewrap
-            curl
+            python3
             coreutils
             libnotify  # for notify-send
           ];
 
           text = ''
+            export UPDATE_CHECK="${updateCheck}"
             ${builtins.readFile ./scripts/claude-wrapper-with-update.sh}
           '';
         };
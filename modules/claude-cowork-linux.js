@@ -13,6 +13,9 @@ const { randomUUID } = require('crypto');
 const COWORK_BASE_DIR = '/tmp/claude-cowork-sessions';
 const BWRAP_PATH = '/usr/bin/bwrap';
 
+// Checked once; the host filesystem layout doesn't change between spawns
+const HAS_LIB64 = fs.existsSync('/lib64');
+
 /**
  * Session Manager - Tracks active Cowork sessions
  */
@@ -187,7 +190,7 @@ class CoworkSessionManager {
     ];
 
     // Add lib64 if it exists (64-bit systems)
-    if (fs.existsSync('/lib64')) {
+    if (HAS_LIB64) {
       bwrapArgs.push('--ro-bind', '/lib64', '/lib64');
     }
 
@@ -1,16 +1,23 @@
 #!/usr/bin/env python3
 """
-Complete ASAR archive tool - extract and pack
+Complete ASAR archive tool - extract, pack, list, verify and batch
 Based on Electron ASAR format specification
 
 Note: "pickle" in the ASAR format refers to a header size field,
 not Python's pickle module. This tool only handles JSON data.
 """
 import struct
+import hashlib
 import json
 import os
+import subprocess
 import sys
 import shutil
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 
 
 def read_asar_header(f):
@@ -46,6 +53,21 @@ def read_asar_header(f):
     return header, base_offset
 
 
+def iter_entries(node, prefix=''):
+    """Yield (path, info) for every file entry in an ASAR header"""
+    for name, info in node.get('files', {}).items():
+        path = f"{prefix}/{name}" if prefix else name
+        if 'files' in info:
+            yield from iter_entries(info, path)
+        else:
+            yield path, info
+
+
+def has_data(info):
+    """Unpacked files and symlinks have no data in the archive itself"""
+    return not info.get('unpacked') and 'link' not in info
+
+
 def extract_file(f, file_info, base_offset, output_path):
     """Extract a single file from ASAR"""
     offset = int(file_info.get('offset', 0))
@@ -61,7 +83,7 @@ def extract_file(f, file_info, base_offset, output_path):
         out.write(data)
 
 
-def extract_directory(f, dir_info, base_offset, output_dir):
+def extract_directory(f, dir_info, base_offset, output_dir, packed_only=False):
     """Recursively extract directory"""
     files = dir_info.get('files', {})
 
@@ -71,19 +93,25 @@ def extract_directory(f, dir_info, base_offset, output_dir):
         if 'files' in info:
             # It's a directory
             os.makedirs(output_path, exist_ok=True)
-            extract_directory(f, info, base_offset, output_path)
+            extract_directory(f, info, base_offset, output_path, packed_only)
+        elif packed_only and not has_data(info):
+            continue
         else:
             # It's a file
             extract_file(f, info, base_offset, output_path)
 
 
-def extract_asar(asar_path, output_dir):
-    """Extract entire ASAR archive"""
+def extract_asar(asar_path, output_dir, packed_only=False):
+    """Extract entire ASAR archive
+
+    With packed_only, unpacked files and symlinks are left out instead of
+    being written as placeholder files.
+    """
     with open(asar_path, 'rb') as f:
         header, base_offset = read_asar_header(f)
 
         # Extract root directory
-        extract_directory(f, header, base_offset, output_dir)
+        extract_directory(f, header, base_offset, output_dir, packed_only)
 
 
 def build_header(root_dir):
@@ -117,7 +145,7 @@ def calculate_offsets(header, current_offset=0):
         if 'files' in info:
             # Directory
             current_offset = calculate_offsets(info, current_offset)
-        else:
+        elif has_data(info):
             # File
             info['offset'] = str(current_offset)
             current_offset += info['size']
@@ -135,17 +163,31 @@ def write_files(f, root_dir, header):
         if 'files' in info:
             # Directory
             write_files(f, full_path, info)
-        else:
+        elif has_data(info):
             # File
             with open(full_path, 'rb') as file_in:
                 data = file_in.read()
                 f.write(data)
 
 
-def pack_asar(input_dir, output_asar):
+def add_entries(header, entries):
+    """Add header entries (path -> info) that have no file on disk, such as
+    unpacked files and symlinks carried over from another archive"""
+    for path, info in entries.items():
+        node = header
+        *dirs, name = path.split('/')
+        for part in dirs:
+            node = node['files'].setdefault(part, {'files': {}})
+        # A file produced on disk takes precedence
+        node['files'].setdefault(name, dict(info))
+
+
+def pack_asar(input_dir, output_asar, extra_entries=None):
     """Pack directory into ASAR archive"""
     # Build header
     header = build_header(input_dir)
+    if extra_entries:
+        add_entries(header, extra_entries)
 
     # Calculate offsets
     calculate_offsets(header)
@@ -184,11 +226,333 @@ def pack_asar(input_dir, output_asar):
         write_files(f, input_dir, header)
 
 
+def list_asar(asar_path):
+    """Return (path, size) for every file in an ASAR archive"""
+    with open(asar_path, 'rb') as f:
+        header, _ = read_asar_header(f)
+    return [(path, int(info.get('size', 0))) for path, info in iter_entries(header)]
+
+
+def verify_asar(asar_path):
+    """Check that every packed file lies inside the archive and matches its
+    integrity hash (when the header has one). Returns (files, hashed)."""
+    archive_size = os.path.getsize(asar_path)
+    files = 0
+    hashed = 0
+
+    with open(asar_path, 'rb') as f:
+        header, base_offset = read_asar_header(f)
+
+        for path, info in iter_entries(header):
+            if not has_data(info):
+                continue
+            files += 1
+
+            offset = int(info.get('offset', 0))
+            size = int(info.get('size', 0))
+            if base_offset + offset + size > archive_size:
+                raise ValueError(f"{path}: data extends past end of archive")
+
+            integrity = info.get('integrity')
+            if not integrity:
+                continue
+            if integrity.get('algorithm', '').upper() != 'SHA256':
+                raise ValueError(f"{path}: unsupported integrity algorithm {integrity.get('algorithm')}")
+
+            f.seek(base_offset + offset)
+            digest = hashlib.sha256(f.read(size)).hexdigest()
+            if digest != integrity.get('hash'):
+                raise ValueError(f"{path}: integrity hash mismatch")
+            hashed += 1
+
+    return files, hashed
+
+
+def transform_asar(asar_path, output_asar, commands, cwd=None):
+    """Extract an archive, run commands on the extracted tree, and repack it.
+
+    Each command is an argument list run in cwd; "{dir}" is replaced by the
+    extracted directory. Unpacked files and symlinks keep their header
+    entries, and the archive's .unpacked directory is copied next to the
+    output. The output is written next to its destination and renamed
+    into place, so a failed transform never leaves a partial archive.
+    """
+    with open(asar_path, 'rb') as f:
+        header, _ = read_asar_header(f)
+    external = {path: info for path, info in iter_entries(header) if not has_data(info)}
+
+    output_dir = os.path.dirname(os.path.abspath(output_asar))
+    work_dir = tempfile.mkdtemp(prefix='asar-transform-', dir=output_dir)
+    try:
+        contents = os.path.join(work_dir, 'contents')
+        extract_asar(asar_path, contents, packed_only=True)
+
+        for command in commands:
+            args = [arg.replace('{dir}', contents) for arg in command]
+            subprocess.run(args, check=True, stdout=subprocess.DEVNULL, cwd=cwd)
+
+        tmp_asar = os.path.join(work_dir, 'output.asar')
+        pack_asar(contents, tmp_asar, extra_entries=external)
+
+        unpacked_dir = asar_path + '.unpacked'
+        if (os.path.isdir(unpacked_dir)
+                and os.path.abspath(asar_path) != os.path.abspath(output_asar)):
+            shutil.copytree(unpacked_dir, output_asar + '.unpacked',
+                            symlinks=True, dirs_exist_ok=True)
+        os.replace(tmp_asar, output_asar)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+# Batch mode
+#
+# A manifest is a JSON file:
+#
+#   {
+#     "workers": 8,            (optional, default: CPU count)
+#     "per_device": 2,         (optional, concurrent jobs per disk)
+#     "jobs": [
+#       {"op": "extract", "archive": "app.asar", "output": "app-contents"},
+#       {"op": "pack", "source": "app-contents", "archive": "out.asar"},
+#       {"op": "list", "archive": "app.asar.pre-cowork"},
+#       {"op": "verify", "archive": "app.asar.backup-1.1.1200"},
+#       {"op": "transform", "archive": "app.asar", "output": "patched.asar",
+#        "commands": [["node", "patch-cowork-linux-v3.js", "{dir}"]]}
+#     ]
+#   }
+#
+# Jobs are independent and may run in any order. Relative paths are
+# resolved against the manifest's directory, and transform commands run
+# there too unless the job sets its own "cwd".
+
+BATCH_PER_DEVICE = 2
+
+BATCH_PATH_KEYS = {
+    'extract': (['archive'], ['output']),
+    'pack': (['source'], ['archive']),
+    'list': (['archive'], []),
+    'verify': (['archive'], []),
+    'transform': (['archive'], ['output']),
+}
+
+
+def job_paths(job):
+    """Return (inputs, outputs) paths of a batch job"""
+    input_keys, output_keys = BATCH_PATH_KEYS[job['op']]
+    return [job[k] for k in input_keys], [job[k] for k in output_keys]
+
+
+def device_of(path):
+    """Return the device a path lives on (or would be created on)"""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return os.stat(path).st_dev
+
+
+def job_error(job):
+    """Return why a batch job can't be run, or None if it looks valid"""
+    if not isinstance(job, dict):
+        return f"Invalid job: expected an object, got {type(job).__name__}"
+    if job.get('op') not in BATCH_PATH_KEYS:
+        return f"Unknown op: {job.get('op')}"
+    input_keys, output_keys = BATCH_PATH_KEYS[job['op']]
+    missing = [k for k in input_keys + output_keys if not isinstance(job.get(k), str)]
+    if missing:
+        return f"Missing {', '.join(missing)} for {job['op']}"
+    return None
+
+
+def job_devices(job):
+    """Return the set of devices a job reads from or writes to"""
+    try:
+        inputs, outputs = job_paths(job)
+        return {device_of(p) for p in inputs + outputs}
+    except OSError:
+        # The worker reports the error; don't let the job hold a disk
+        return set()
+
+
+def run_job(job):
+    """Run a single batch job (in a worker process) and return its result"""
+    op = job['op']
+    if op not in BATCH_PATH_KEYS:
+        raise ValueError(f"Unknown op: {op}")
+
+    if op == 'extract':
+        extract_asar(job['archive'], job['output'])
+        entries = list_asar(job['archive'])
+        return {'files': len(entries), 'bytes': sum(size for _, size in entries)}
+
+    if op == 'pack':
+        pack_asar(job['source'], job['archive'])
+        with open(job['archive'], 'rb') as f:
+            header, _ = read_asar_header(f)
+        return {'files': sum(1 for _ in iter_entries(header)),
+                'size': os.path.getsize(job['archive'])}
+
+    if op == 'list':
+        entries = list_asar(job['archive'])
+        return {'files': len(entries), 'bytes': sum(size for _, size in entries),
+                'entries': [path for path, _ in entries]}
+
+    if op == 'verify':
+        files, hashed = verify_asar(job['archive'])
+        return {'files': files, 'integrity_checked': hashed}
+
+    transform_asar(job['archive'], job['output'], job.get('commands', []), job.get('cwd'))
+    return {'size': os.path.getsize(job['output'])}
+
+
+def run_job_safe(job):
+    """Run a job, returning (result, error) so failures cross the process boundary cleanly"""
+    start = time.monotonic()
+    try:
+        return run_job(job), None, time.monotonic() - start
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}", time.monotonic() - start
+
+
+def load_manifest(manifest_path):
+    """Load a batch manifest and resolve job paths relative to it"""
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get('jobs', []), list):
+        raise ValueError("manifest must be an object with a list of jobs")
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    for job in manifest.get('jobs', []):
+        if not isinstance(job, dict):
+            continue
+        for key in ('archive', 'output', 'source', 'cwd'):
+            if isinstance(job.get(key), str):
+                job[key] = os.path.join(base_dir, os.path.expanduser(job[key]))
+        if job.get('op') == 'transform':
+            job.setdefault('cwd', base_dir)
+    return manifest
+
+
+def manifest_count(manifest, key, default):
+    """Read a positive integer setting from a manifest"""
+    value = manifest.get(key)
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        raise ValueError(f"{key} must be an integer, got {value!r}")
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be an integer, got {value!r}") from None
+    if count < 1:
+        raise ValueError(f"{key} must be at least 1, got {count}")
+    return count
+
+
+def run_batch(manifest, progress=sys.stderr):
+    """Run all manifest jobs on a process pool and return a summary dict.
+
+    At most per_device jobs touch any one disk at a time, so jobs on the
+    same disk don't thrash while jobs on other disks keep the CPUs busy.
+    """
+    jobs = manifest.get('jobs', [])
+    workers = manifest_count(manifest, 'workers', os.cpu_count() or 1)
+    per_device = manifest_count(manifest, 'per_device', BATCH_PER_DEVICE)
+
+    results = [None] * len(jobs)
+    device_load = Counter()
+    running = {}
+    start = time.monotonic()
+    finished = 0
+
+    def record(index, job, result, error, elapsed):
+        nonlocal finished
+        op = job.get('op') if isinstance(job, dict) else None
+        archive = job.get('archive') if isinstance(job, dict) else None
+        entry = {
+            'index': index,
+            'op': op,
+            'archive': archive,
+            'status': 'error' if error else 'ok',
+            'elapsed': round(elapsed, 3),
+        }
+        if error:
+            entry['error'] = error
+        else:
+            entry['result'] = result
+        results[index] = entry
+
+        finished += 1
+        status = f"FAILED: {error}" if error else "ok"
+        print(f"[{finished}/{len(jobs)}] {op} {archive} "
+              f"({elapsed:.1f}s) {status}", file=progress, flush=True)
+
+    # Malformed jobs fail up front instead of taking the batch down
+    pending = []
+    for index, job in enumerate(jobs):
+        error = job_error(job)
+        if error:
+            record(index, job, None, error, 0.0)
+        else:
+            pending.append((index, job, job_devices(job)))
+
+    submitted = {}
+    died = "Worker process died unexpectedly"
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while pending or running:
+                # Start every job whose disks have a free slot
+                for item in list(pending):
+                    if len(running) >= workers:
+                        break
+                    index, job, devices = item
+                    if any(device_load[d] >= per_device for d in devices):
+                        continue
+                    running[executor.submit(run_job_safe, job)] = item
+                    submitted[index] = time.monotonic()
+                    pending.remove(item)
+                    device_load.update(devices)
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, job, devices = running.pop(future)
+                    device_load.subtract(devices)
+
+                    try:
+                        outcome = future.result()
+                    except BrokenProcessPool:
+                        outcome = None, died, time.monotonic() - submitted[index]
+                    record(index, job, *outcome)
+    except BrokenProcessPool:
+        # A worker was killed (e.g. by the OOM killer) and took the pool
+        # down; report what's left instead of losing the summary
+        for index, job, _ in running.values():
+            record(index, job, None, died, time.monotonic() - submitted[index])
+        for index, job, _ in pending:
+            record(index, job, None, "Not run: the worker pool stopped", 0.0)
+
+    failed = sum(1 for r in results if r['status'] == 'error')
+    return {
+        'total': len(jobs),
+        'succeeded': len(jobs) - failed,
+        'failed': failed,
+        'workers': workers,
+        'per_device': per_device,
+        'elapsed': round(time.monotonic() - start, 3),
+        'jobs': results,
+    }
+
+
 def main():
     if len(sys.argv) < 3:
         print("Usage:")
         print(f"  {sys.argv[0]} extract <asar_file> <output_dir>")
         print(f"  {sys.argv[0]} pack <input_dir> <output_asar>")
+        print(f"  {sys.argv[0]} list <asar_file>")
+        print(f"  {sys.argv[0]} verify <asar_file>")
+        print(f"  {sys.argv[0]} batch <manifest.json>")
         sys.exit(1)
 
     command = sys.argv[1]
@@ -213,9 +577,31 @@ def main():
         pack_asar(input_dir, output_asar)
         print("Done!")
 
+    elif command == 'list':
+        for path, size in list_asar(sys.argv[2]):
+            print(f"{path} ({size} bytes)")
+
+    elif command == 'verify':
+        try:
+            files, hashed = verify_asar(sys.argv[2])
+        except ValueError as e:
+            print(f"Verification failed: {e}")
+            sys.exit(1)
+        print(f"OK: {files} files ({hashed} integrity hashes checked)")
+
+    elif command == 'batch':
+        # Progress goes to stderr; stdout carries only the JSON summary
+        try:
+            summary = run_batch(load_manifest(sys.argv[2]))
+        except ValueError as e:
+            print(f"Invalid manifest: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(summary, indent=2))
+        sys.exit(1 if summary['failed'] else 0)
+
     else:
         print(f"Unknown command: {command}")
-        print("Valid commands: extract, pack")
+        print("Valid commands: extract, pack, list, verify, batch")
         sys.exit(1)
 
 
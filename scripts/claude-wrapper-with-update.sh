@@ -1,14 +1,16 @@
 #!/bin/bash
 # Claude Desktop Wrapper with Auto-Update Check
-# Checks for updates before launching Claude
+# Reports updates found by the last background check, then launches Claude
 
 set -e
 
 # Configuration
 UPDATE_CHECK_INTERVAL=$((24 * 3600))  # 24 hours in seconds
 LAST_CHECK_FILE="$HOME/.cache/claude-desktop/last-update-check"
+NOTIFIED_FILE="$HOME/.cache/claude-desktop/notified-version"
 VERSION_FILE="/opt/claude-desktop/version.txt"
 UPDATE_SCRIPT="/opt/claude-desktop/update-claude-desktop.sh"
+UPDATE_CHECK="${UPDATE_CHECK:-/opt/claude-desktop/update_check.py}"
 
 # Colors
 RED='\033[0;31m'
@@ -39,26 +41,21 @@ should_check_update() {
     fi
 }
 
-# Function to quick-check for updates (fast, non-blocking)
-quick_update_check() {
-    local current_version
-    local current_build
-    local test_build
-    local test_version
-    local base_url
-
-    current_version=$(cat "$VERSION_FILE" 2>/dev/null || echo "1.1.0")
-    current_build=$(echo "$current_version" | cut -d. -f3)
-    test_build=$((current_build + 10))  # Check 10 versions ahead
-    test_version="1.1.$test_build"
-    base_url="https://storage.googleapis.com/osprey-downloads-c02f6a0d-347c-492b-a752-3e0651722e97/nest-mac-release"
-
-    # Quick HEAD request with 2s timeout
-    if timeout 2 curl -sf -I "$base_url/Claude-darwin-universal-${test_version}.dmg" >/dev/null 2>&1; then
-        return 0  # Update available
-    else
-        return 1  # No update or network issue
+# Function to check the cached result of the last background probe (no network)
+# Succeeds once per newly found version so the user isn't asked on every launch
+cached_update_check() {
+    local latest
+
+    latest=$(python3 "$UPDATE_CHECK" status 2>/dev/null) || return 1
+    if [ "$latest" = "$(cat "$NOTIFIED_FILE" 2>/dev/null)" ]; then
+        return 1
     fi
+    echo "$latest" > "$NOTIFIED_FILE"
+}
+
+# Function to refresh the update cache in the background (never delays launch)
+start_background_check() {
+    nohup python3 "$UPDATE_CHECK" refresh >/dev/null 2>&1 &
 }
 
 # Function to show update notification
@@ -74,14 +71,15 @@ show_update_notification() {
 }
 
 # Main update check logic
-if should_check_update; then
-    echo -e "${BLUE}Checking for Claude Desktop updates...${NC}"
-
-    # Record check time
-    date +%s > "$LAST_CHECK_FILE"
+if [ -f "$UPDATE_CHECK" ]; then
+    if should_check_update; then
+        # Record check time and probe for new releases while Claude starts;
+        # the result is picked up on the next launch
+        date +%s > "$LAST_CHECK_FILE"
+        start_background_check
+    fi
 
-    # Quick check (non-blocking, times out after 2s)
-    if quick_update_check; then
+    if cached_update_check; then
         show_update_notification
 
         # Ask user if they want to update now
@@ -101,8 +99,6 @@ if should_check_update; then
         else
             echo "Skipping update. You can update later with: sudo bash $UPDATE_SCRIPT"
         fi
-    else
-        echo -e "${GREEN}✓ Claude Desktop is up to date${NC}"
     fi
 fi
 
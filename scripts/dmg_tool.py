@@ -0,0 +1,649 @@
+#!/usr/bin/env python3
+"""
+Selective file extraction from macOS UDIF disk images (.dmg)
+
+Reads the UDIF block table and only inflates the chunks that back the
+requested HFS+ files, so pulling app.asar out of the Claude DMG does not
+need dmg2img, 7z, or a full copy of the app bundle on disk.
+
+Supported chunk types: raw, zero-fill, ADC, zlib, bzip2 and LZMA.
+LZFSE-compressed images and APFS volumes are not supported; callers
+should fall back to dmg2img + 7z for those.
+"""
+import bisect
+import bz2
+import fnmatch
+import lzma
+import os
+import plistlib
+import struct
+import sys
+import zlib
+from collections import OrderedDict
+
+
+SECTOR_SIZE = 512
+
+# UDIF chunk types (BLKXChunkEntry.EntryType)
+CHUNK_ZERO = 0x00000000
+CHUNK_RAW = 0x00000001
+CHUNK_IGNORE = 0x00000002
+CHUNK_ADC = 0x80000004
+CHUNK_ZLIB = 0x80000005
+CHUNK_BZIP2 = 0x80000006
+CHUNK_LZFSE = 0x80000007
+CHUNK_LZMA = 0x80000008
+CHUNK_COMMENT = 0x7FFFFFFE
+CHUNK_TERMINATOR = 0xFFFFFFFF
+
+# HFS+ catalog record types
+HFS_FOLDER_RECORD = 1
+HFS_FILE_RECORD = 2
+
+HFS_ROOT_FOLDER_ID = 2
+HFS_PRIVATE_DIR_NAME = '\x00\x00\x00\x00HFS+ Private Data'
+
+# BSD flags / mode bits stored in HFSPlusBSDInfo
+UF_COMPRESSED = 0x20
+S_IFMT = 0o170000
+S_IFLNK = 0o120000
+
+# Number of decompressed UDIF chunks kept in memory
+CHUNK_CACHE_SIZE = 16
+
+# Size of the pieces file data is streamed in
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class DMGError(Exception):
+    """Raised when a disk image cannot be read"""
+
+
+def adc_decompress(data):
+    """Decompress Apple Data Compression (ADC) chunk data"""
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        b = data[i]
+        if b & 0x80:
+            # Literal run
+            length = (b & 0x7F) + 1
+            out += data[i + 1:i + 1 + length]
+            i += 1 + length
+            continue
+
+        if b & 0x40:
+            # Three-byte back reference
+            length = (b & 0x3F) + 4
+            distance = (data[i + 1] << 8) | data[i + 2]
+            i += 3
+        else:
+            # Two-byte back reference
+            length = ((b & 0x3C) >> 2) + 3
+            distance = ((b & 0x03) << 8) | data[i + 1]
+            i += 2
+
+        start = len(out) - distance - 1
+        if start < 0:
+            raise DMGError("Invalid ADC back reference")
+        for j in range(length):
+            out.append(out[start + j])
+
+    return bytes(out)
+
+
+def read_koly(f):
+    """Read the 512-byte UDIF trailer at the end of the image"""
+    f.seek(-512, os.SEEK_END)
+    trailer = f.read(512)
+    if len(trailer) < 512 or trailer[:4] != b'koly':
+        raise DMGError("Not a UDIF disk image (missing koly trailer)")
+
+    data_fork_offset = struct.unpack_from('>Q', trailer, 24)[0]
+    xml_offset, xml_length = struct.unpack_from('>QQ', trailer, 216)
+    if xml_length == 0:
+        raise DMGError("Disk image has no XML property list")
+
+    return {
+        'data_fork_offset': data_fork_offset,
+        'xml_offset': xml_offset,
+        'xml_length': xml_length,
+    }
+
+
+def parse_mish(data, data_fork_offset):
+    """Parse a blkx 'mish' table into (start_sector, sector_count, chunks)"""
+    if data[:4] != b'mish':
+        raise DMGError("Invalid blkx table (missing mish signature)")
+
+    first_sector, sector_count, data_offset = struct.unpack_from('>QQQ', data, 8)
+    chunk_count = struct.unpack_from('>I', data, 200)[0]
+
+    chunks = []
+    for n in range(chunk_count):
+        entry_type, _, sector, count, comp_offset, comp_length = \
+            struct.unpack_from('>IIQQQQ', data, 204 + n * 40)
+        if entry_type in (CHUNK_COMMENT, CHUNK_TERMINATOR) or count == 0:
+            continue
+        chunks.append((
+            (first_sector + sector) * SECTOR_SIZE,
+            count * SECTOR_SIZE,
+            entry_type,
+            data_fork_offset + data_offset + comp_offset,
+            comp_length,
+        ))
+
+    return first_sector, sector_count, chunks
+
+
+class DMGImage:
+    """Random-access reader over the uncompressed contents of a UDIF image"""
+
+    def __init__(self, dmg_path):
+        self.f = open(dmg_path, 'rb')
+        try:
+            koly = read_koly(self.f)
+            self.f.seek(koly['xml_offset'])
+            plist = plistlib.loads(self.f.read(koly['xml_length']))
+        except Exception:
+            self.f.close()
+            raise
+
+        self.partitions = []
+        chunks = []
+        for entry in plist.get('resource-fork', {}).get('blkx', []):
+            first_sector, sector_count, entry_chunks = parse_mish(
+                entry['Data'], koly['data_fork_offset'])
+            name = entry.get('CFName') or entry.get('Name', '')
+            self.partitions.append((name, first_sector * SECTOR_SIZE,
+                                    sector_count * SECTOR_SIZE))
+            chunks.extend(entry_chunks)
+
+        chunks.sort()
+        self.chunks = chunks
+        self.chunk_starts = [c[0] for c in chunks]
+        self.cache = OrderedDict()
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _chunk_data(self, index):
+        """Return the decompressed contents of a chunk (LRU cached)"""
+        if index in self.cache:
+            self.cache.move_to_end(index)
+            return self.cache[index]
+
+        _, length, entry_type, comp_offset, comp_length = self.chunks[index]
+        if entry_type in (CHUNK_ZERO, CHUNK_IGNORE):
+            data = bytes(length)
+        else:
+            self.f.seek(comp_offset)
+            raw = self.f.read(comp_length)
+            if entry_type == CHUNK_RAW:
+                data = raw
+            elif entry_type == CHUNK_ZLIB:
+                data = zlib.decompress(raw)
+            elif entry_type == CHUNK_BZIP2:
+                data = bz2.decompress(raw)
+            elif entry_type == CHUNK_LZMA:
+                data = lzma.decompress(raw)
+            elif entry_type == CHUNK_ADC:
+                data = adc_decompress(raw)
+            elif entry_type == CHUNK_LZFSE:
+                raise DMGError("LZFSE-compressed images are not supported")
+            else:
+                raise DMGError(f"Unknown chunk type: 0x{entry_type:08x}")
+
+        self.cache[index] = data
+        if len(self.cache) > CHUNK_CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return data
+
+    def read(self, offset, size):
+        """Read size bytes at a byte offset of the uncompressed disk"""
+        out = bytearray()
+        index = bisect.bisect_right(self.chunk_starts, offset) - 1
+        if index < 0:
+            raise DMGError(f"Offset {offset} is outside the disk image")
+
+        while size > 0:
+            if index >= len(self.chunks):
+                raise DMGError(f"Read past end of disk image at {offset}")
+            start, length = self.chunks[index][:2]
+            if offset >= start + length:
+                index += 1
+                continue
+            if offset < start:
+                raise DMGError(f"Disk image has a hole at offset {offset}")
+
+            data = self._chunk_data(index)
+            piece = data[offset - start:offset - start + size]
+            out += piece
+            offset += len(piece)
+            size -= len(piece)
+            index += 1
+
+        return bytes(out)
+
+    def find_hfs_partition(self):
+        """Return the byte offset of the first HFS+/HFSX volume"""
+        for name, offset, length in self.partitions:
+            if 'Apple_HFS' in name:
+                return offset
+
+        # Images without a partition map hold a bare volume
+        for _, offset, length in self.partitions:
+            if length >= 1536 and self.read(offset + 1024, 2) in (b'H+', b'HX'):
+                return offset
+
+        raise DMGError("No HFS+ volume found in disk image (APFS is not supported)")
+
+
+class HFSFork:
+    """Extent-mapped fork (data or resource) of an HFS+ file"""
+
+    def __init__(self, volume, fork_data, file_id=0, fork_type=0):
+        self.volume = volume
+        self.size = struct.unpack_from('>Q', fork_data, 0)[0]
+        total_blocks = struct.unpack_from('>I', fork_data, 12)[0]
+
+        self.extents = []
+        for n in range(8):
+            start, count = struct.unpack_from('>II', fork_data, 16 + n * 8)
+            if count:
+                self.extents.append((start, count))
+
+        found = sum(count for _, count in self.extents)
+        if found < total_blocks and file_id:
+            self.extents.extend(volume.overflow_extents(file_id, fork_type, found))
+
+    def iter_chunks(self, size=COPY_BUFFER_SIZE):
+        """Yield the fork contents in pieces of at most size bytes"""
+        block_size = self.volume.block_size
+        remaining = self.size
+        for start, count in self.extents:
+            offset = start * block_size
+            extent_remaining = min(count * block_size, remaining)
+            while extent_remaining > 0:
+                n = min(size, extent_remaining)
+                yield self.volume.read(offset, n)
+                offset += n
+                extent_remaining -= n
+                remaining -= n
+            if remaining <= 0:
+                break
+
+    def read_all(self):
+        return b''.join(self.iter_chunks())
+
+
+class BTree:
+    """Read-only HFS+ B-tree (catalog, extents overflow, attributes)"""
+
+    def __init__(self, fork, id_offset):
+        self.fork = fork
+        # Offset of the first key field (parent/file ID) that records are
+        # ordered by, counted from the start of the key length field
+        self.id_offset = id_offset
+
+        # Only the header record of node 0 is needed to learn the node size
+        if not fork.extents:
+            raise DMGError("B-tree file has no extents")
+        header = fork.volume.read(fork.extents[0][0] * fork.volume.block_size, 512)
+        (self.depth, self.root, _, _, _, self.node_size, self.max_key_length) = \
+            struct.unpack_from('>HIIIIHH', header, 14)
+        self.variable_index_keys = bool(struct.unpack_from('>I', header, 52)[0] & 4)
+        self.node_extents = fork.extents
+
+    def read_node(self, number):
+        """Read a node and return (kind, forward_link, records)"""
+        block_size = self.fork.volume.block_size
+        offset = number * self.node_size
+        node = bytearray()
+        for start, count in self.node_extents:
+            extent_bytes = count * block_size
+            if offset >= extent_bytes:
+                offset -= extent_bytes
+                continue
+            # A node may span extents; never read past the end of this one
+            length = min(self.node_size - len(node), extent_bytes - offset)
+            node += self.fork.volume.read(start * block_size + offset, length)
+            if len(node) == self.node_size:
+                break
+            offset = 0
+        if len(node) < self.node_size:
+            raise DMGError(f"B-tree node {number} lies past the end of its file")
+        node = bytes(node)
+
+        forward, _, kind, _, num_records = struct.unpack_from('>IIbBH', node, 0)
+        offsets = [struct.unpack_from('>H', node, self.node_size - 2 * (i + 1))[0]
+                   for i in range(num_records + 1)]
+        records = [node[offsets[i]:offsets[i + 1]] for i in range(num_records)]
+        return kind, forward, records
+
+    def _record_id(self, record):
+        return struct.unpack_from('>I', record, self.id_offset)[0]
+
+    def iter_records(self, record_id):
+        """Yield (key, data) for leaf records whose first key field is record_id"""
+        if self.root == 0:
+            return
+
+        # Descend using only the leading ID so that no name comparison
+        # (and no HFS+ case folding) is needed to find the first leaf
+        kind, forward, records = self.read_node(self.root)
+        while kind == 0:
+            child = None
+            for record in records:
+                if child is not None and self._record_id(record) >= record_id:
+                    break
+                key_length = struct.unpack_from('>H', record, 0)[0]
+                if not self.variable_index_keys:
+                    key_length = self.max_key_length
+                child = struct.unpack_from('>I', record, 2 + key_length)[0]
+            kind, forward, records = self.read_node(child)
+
+        # Walk the leaf chain until the ID moves past the one requested
+        while True:
+            for record in records:
+                current = self._record_id(record)
+                if current < record_id:
+                    continue
+                if current > record_id:
+                    return
+                key_length = struct.unpack_from('>H', record, 0)[0]
+                yield record[:2 + key_length], record[2 + key_length:]
+            if not forward:
+                return
+            _, forward, records = self.read_node(forward)
+
+
+def decode_hfs_name(key, offset):
+    """Decode an HFSUniStr255 name stored in a B-tree key"""
+    length = struct.unpack_from('>H', key, offset)[0]
+    return key[offset + 2:offset + 2 + length * 2].decode('utf-16-be')
+
+
+def safe_name(name):
+    """Return a catalog name as a single path component.
+
+    HFS+ names may contain '/', which macOS presents as ':' and so do we.
+    Names that could step outside the output directory are refused.
+    """
+    name = name.replace('/', ':')
+    if name in ('', '.', '..') or '\x00' in name:
+        raise DMGError(f"Unsafe file name in catalog: {name!r}")
+    return name
+
+
+class HFSVolume:
+    """Minimal read-only HFS+/HFSX volume on top of a DMGImage"""
+
+    def __init__(self, image, partition_offset):
+        self.image = image
+        self.offset = partition_offset
+
+        header = image.read(partition_offset + 1024, 512)
+        if header[:2] not in (b'H+', b'HX'):
+            raise DMGError("Partition is not an HFS+ volume")
+        self.block_size = struct.unpack_from('>I', header, 40)[0]
+
+        self.extents_tree = None
+        extents_fork = HFSFork(self, header[192:272])
+        if extents_fork.size:
+            self.extents_tree = BTree(extents_fork, 4)
+
+        self.catalog = BTree(HFSFork(self, header[272:352], 4), 2)
+
+        self.attributes = None
+        attributes_fork = HFSFork(self, header[352:432], 8)
+        if attributes_fork.size:
+            self.attributes = BTree(attributes_fork, 4)
+
+        self.private_dir_id = None
+
+    def read(self, offset, size):
+        return self.image.read(self.offset + offset, size)
+
+    def overflow_extents(self, file_id, fork_type, first_block):
+        """Return extents beyond the eight stored inline in a fork"""
+        extents = []
+        if self.extents_tree is None:
+            return extents
+        for key, data in self.extents_tree.iter_records(file_id):
+            key_fork_type, = struct.unpack_from('>B', key, 2)
+            start_block, = struct.unpack_from('>I', key, 8)
+            if key_fork_type != fork_type or start_block < first_block:
+                continue
+            for n in range(8):
+                start, count = struct.unpack_from('>II', data, n * 8)
+                if count:
+                    extents.append((start_block, start, count))
+                    start_block += count
+        extents.sort()
+        return [(start, count) for _, start, count in extents]
+
+    def list_folder(self, folder_id):
+        """Return {name: record} for the children of a folder"""
+        children = {}
+        for key, data in self.catalog.iter_records(folder_id):
+            record_type = struct.unpack_from('>h', data, 0)[0]
+            if record_type in (HFS_FOLDER_RECORD, HFS_FILE_RECORD):
+                children[safe_name(decode_hfs_name(key, 6))] = data
+        return children
+
+    def lookup(self, path):
+        """Resolve a slash-separated path relative to the volume root"""
+        record = None
+        folder_id = HFS_ROOT_FOLDER_ID
+        for part in [p for p in path.split('/') if p]:
+            if record is not None and not is_folder(record):
+                raise FileNotFoundError(path)
+            children = self.list_folder(folder_id)
+            if part not in children:
+                raise FileNotFoundError(path)
+            record = children[part]
+            folder_id = struct.unpack_from('>I', record, 8)[0]
+        return record
+
+    def resolve_hard_link(self, record):
+        """Return the iNode record a hard link file record points to"""
+        if record[48:56] != b'hlnkhfs+':
+            return record
+        if self.private_dir_id is None:
+            private = self.list_folder(HFS_ROOT_FOLDER_ID).get(HFS_PRIVATE_DIR_NAME)
+            if private is None:
+                raise DMGError("Hard link found but volume has no private data folder")
+            self.private_dir_id = struct.unpack_from('>I', private, 8)[0]
+        inode_num = struct.unpack_from('>I', record, 44)[0]
+        target = self.list_folder(self.private_dir_id).get(f'iNode{inode_num}')
+        if target is None:
+            raise DMGError(f"Dangling hard link to iNode{inode_num}")
+        return target
+
+    def get_attribute(self, file_id, name):
+        """Return the inline value of an extended attribute, or None"""
+        if self.attributes is None:
+            return None
+        for key, data in self.attributes.iter_records(file_id):
+            if decode_hfs_name(key, 12) != name:
+                continue
+            record_type = struct.unpack_from('>I', data, 0)[0]
+            if record_type == 0x10:
+                size = struct.unpack_from('>I', data, 12)[0]
+                return data[16:16 + size]
+            if record_type == 0x20:
+                return HFSFork(self, data[8:88]).read_all()
+        return None
+
+    def iter_file_chunks(self, record):
+        """Yield the contents of a file record, handling HFS+ compression"""
+        record = self.resolve_hard_link(record)
+        file_id = struct.unpack_from('>I', record, 8)[0]
+        owner_flags = record[41]
+
+        if not owner_flags & UF_COMPRESSED:
+            yield from HFSFork(self, record[88:168], file_id, 0x00).iter_chunks()
+            return
+
+        decmpfs = self.get_attribute(file_id, 'com.apple.decmpfs')
+        if decmpfs is None or decmpfs[:4] != b'fpmc':
+            raise DMGError(f"File {file_id} is compressed but has no decmpfs header")
+        compression_type, = struct.unpack_from('<I', decmpfs, 4)
+
+        if compression_type == 3:
+            yield decmpfs_block(decmpfs[16:])
+        elif compression_type == 4:
+            fork = HFSFork(self, record[168:248], file_id, 0xFF).read_all()
+            data_offset = struct.unpack_from('>I', fork, 0)[0] + 4
+            block_count = struct.unpack_from('<I', fork, data_offset)[0]
+            for n in range(block_count):
+                block_offset, block_size = struct.unpack_from(
+                    '<II', fork, data_offset + 4 + n * 8)
+                start = data_offset + block_offset
+                yield decmpfs_block(fork[start:start + block_size])
+        else:
+            raise DMGError(f"Unsupported HFS+ compression type {compression_type}")
+
+
+def decmpfs_block(data):
+    """Decode one zlib decmpfs block (0x?F marks stored data)"""
+    if data and data[0] & 0x0F == 0x0F:
+        return data[1:]
+    return zlib.decompress(data)
+
+
+def is_folder(record):
+    return struct.unpack_from('>h', record, 0)[0] == HFS_FOLDER_RECORD
+
+
+def file_mode(record):
+    return struct.unpack_from('>H', record, 42)[0]
+
+
+def extract_record(volume, record, output_path):
+    """Write a catalog record (file, symlink or folder tree) to disk"""
+    if is_folder(record):
+        os.makedirs(output_path, exist_ok=True)
+        folder_id = struct.unpack_from('>I', record, 8)[0]
+        for name, child in volume.list_folder(folder_id).items():
+            extract_record(volume, child, os.path.join(output_path, name))
+        return
+
+    parent = os.path.dirname(output_path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+    if file_mode(record) & S_IFMT == S_IFLNK:
+        target = b''.join(volume.iter_file_chunks(record)).decode('utf-8')
+        if os.path.lexists(output_path):
+            os.remove(output_path)
+        os.symlink(target, output_path)
+        return
+
+    with open(output_path, 'wb') as out:
+        for chunk in volume.iter_file_chunks(record):
+            out.write(chunk)
+
+    mode = file_mode(record) & 0o777
+    if mode:
+        os.chmod(output_path, mode)
+
+
+def open_volume(dmg_path):
+    """Open a DMG and return (image, volume) for its HFS+ partition"""
+    image = DMGImage(dmg_path)
+    try:
+        volume = HFSVolume(image, image.find_hfs_partition())
+    except Exception:
+        image.close()
+        raise
+    return image, volume
+
+
+def list_dmg(dmg_path, path=''):
+    """Print the entries of a folder inside the image"""
+    image, volume = open_volume(dmg_path)
+    with image:
+        record = volume.lookup(path) if path else None
+        folder_id = HFS_ROOT_FOLDER_ID
+        if record is not None:
+            if not is_folder(record):
+                raise NotADirectoryError(path)
+            folder_id = struct.unpack_from('>I', record, 8)[0]
+
+        for name, child in sorted(volume.list_folder(folder_id).items()):
+            if is_folder(child):
+                print(f"{name}/")
+            else:
+                size = struct.unpack_from('>Q', child, 88)[0]
+                print(f"{name} ({size} bytes)")
+
+
+def extract_dmg(dmg_path, output_dir, paths):
+    """Extract the given image paths (files or folders) into output_dir"""
+    image, volume = open_volume(dmg_path)
+    with image:
+        for path in paths:
+            # Allow simple wildcards in the last component, e.g. Resources/*.json
+            folder, _, pattern = path.rstrip('/').rpartition('/')
+            if '*' in pattern or '?' in pattern:
+                record = volume.lookup(folder) if folder else None
+                folder_id = (struct.unpack_from('>I', record, 8)[0]
+                             if record is not None else HFS_ROOT_FOLDER_ID)
+                for name, child in sorted(volume.list_folder(folder_id).items()):
+                    if fnmatch.fnmatchcase(name, pattern):
+                        extract_record(volume, child,
+                                       os.path.join(output_dir, folder, name))
+                        print(f"Extracted: {folder}/{name}")
+                continue
+
+            record = volume.lookup(path)
+            extract_record(volume, record, os.path.join(output_dir, path.strip('/')))
+            print(f"Extracted: {path}")
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage:")
+        print(f"  {sys.argv[0]} list <dmg_file> [path]")
+        print(f"  {sys.argv[0]} extract <dmg_file> <output_dir> <path>...")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    try:
+        if command == 'list':
+            if len(sys.argv) > 4:
+                print("Usage: list <dmg_file> [path]")
+                sys.exit(1)
+            list_dmg(sys.argv[2], sys.argv[3] if len(sys.argv) == 4 else '')
+
+        elif command == 'extract':
+            if len(sys.argv) < 5:
+                print("Usage: extract <dmg_file> <output_dir> <path>...")
+                sys.exit(1)
+            dmg_path = sys.argv[2]
+            output_dir = sys.argv[3]
+            print(f"Extracting from {dmg_path} to {output_dir}...")
+            extract_dmg(dmg_path, output_dir, sys.argv[4:])
+            print("Done!")
+
+        else:
+            print(f"Unknown command: {command}")
+            print("Valid commands: list, extract")
+            sys.exit(1)
+
+    except (DMGError, FileNotFoundError, NotADirectoryError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
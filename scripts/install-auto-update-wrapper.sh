@@ -27,6 +27,8 @@ fi
 echo -e "${YELLOW}[1/4] Installing wrapper script...${NC}"
 sudo cp "$SCRIPT_DIR/claude-wrapper-with-update.sh" /opt/claude-desktop/
 sudo chmod +x /opt/claude-desktop/claude-wrapper-with-update.sh
+sudo cp "$SCRIPT_DIR/update_check.py" /opt/claude-desktop/
+sudo cp "$SCRIPT_DIR/dmg_tool.py" /opt/claude-desktop/
 echo -e "${GREEN}✓ Wrapper installed${NC}"
 echo
 
@@ -94,9 +96,8 @@ echo
 echo -e "${GREEN}=== Installation Complete! ===${NC}"
 echo
 echo "The auto-update wrapper is now installed. Claude will check for updates:"
-echo "  • Every 24 hours on launch"
-echo "  • Quick check (2-second timeout, non-blocking)"
-echo "  • Shows notification if update available"
+echo "  • Every 24 hours, in the background (launch never waits on the network)"
+echo "  • Shows notification on the next launch if an update was found"
 echo "  • Asks if you want to update now"
 echo
 echo "Usage:"
@@ -107,6 +108,7 @@ echo
 echo "Configuration:"
 echo "  • Update check interval: Edit UPDATE_CHECK_INTERVAL in wrapper script"
 echo "  • Last check time: ~/.cache/claude-desktop/last-update-check"
+echo "  • Check results: ~/.cache/claude-desktop/update-check.json"
 echo
 echo "To disable auto-update, use the original launcher:"
 echo "  /opt/claude-desktop/claude-desktop.sh"
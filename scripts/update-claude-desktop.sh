@@ -7,6 +7,11 @@ set -e
 INSTALL_DIR="/opt/claude-desktop"
 VERSION_FILE="$INSTALL_DIR/version.txt"
 WORK_DIR="/tmp/claude-update-$$"
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
+# Prefer the helper shipped next to this script, then the installed copy
+DMG_TOOL="$SCRIPT_DIR/dmg_tool.py"
+[ -f "$DMG_TOOL" ] || DMG_TOOL="$INSTALL_DIR/dmg_tool.py"
 
 # Colors
 RED='\033[0;31m'
@@ -37,34 +42,42 @@ else
   echo -e "${YELLOW}Checking for latest version...${NC}"
 
   # Probe for newer versions by checking if files exist
-  # Start from current version and check next 100 build numbers
   BASE_URL="https://storage.googleapis.com/osprey-downloads-c02f6a0d-347c-492b-a752-3e0651722e97/nest-mac-release"
   CURRENT_BUILD=$(echo "$CURRENT_VERSION" | cut -d. -f3)
   LATEST_VERSION="$CURRENT_VERSION"
 
-  # Quick probe - check every 10th version for speed
-  for i in $(seq 10 10 100); do
-    BUILD=$((CURRENT_BUILD + i))
-    TEST_VERSION="1.1.$BUILD"
-    if curl -sf -I "$BASE_URL/Claude-darwin-universal-${TEST_VERSION}.dmg" >/dev/null 2>&1; then
-      LATEST_VERSION="$TEST_VERSION"
-      echo -e "${GREEN}Found newer version: $TEST_VERSION${NC}"
-    fi
-  done
-
-  # Fine-grained search around latest found
-  if [ "$LATEST_VERSION" != "$CURRENT_VERSION" ]; then
-    SEARCH_START=$(echo "$LATEST_VERSION" | cut -d. -f3)
-    for i in $(seq -10 1 10); do
-      BUILD=$((SEARCH_START + i))
-      if [ $BUILD -le $CURRENT_BUILD ]; then
-        continue
-      fi
+  if [ -f /opt/claude-desktop/update_check.py ]; then
+    # Concurrent probes (one request wave instead of ~30 serial curls)
+    LATEST_VERSION=$(python3 /opt/claude-desktop/update_check.py refresh \
+      --current "$CURRENT_VERSION" --base-url "$BASE_URL" \
+      --cache "$WORK_DIR.update-check.json") || true
+    LATEST_VERSION="${LATEST_VERSION:-$CURRENT_VERSION}"
+    rm -f "$WORK_DIR.update-check.json"
+  else
+    # Quick probe - check every 10th version for speed
+    for i in $(seq 10 10 100); do
+      BUILD=$((CURRENT_BUILD + i))
       TEST_VERSION="1.1.$BUILD"
       if curl -sf -I "$BASE_URL/Claude-darwin-universal-${TEST_VERSION}.dmg" >/dev/null 2>&1; then
         LATEST_VERSION="$TEST_VERSION"
+        echo -e "${GREEN}Found newer version: $TEST_VERSION${NC}"
       fi
     done
+
+    # Fine-grained search around latest found
+    if [ "$LATEST_VERSION" != "$CURRENT_VERSION" ]; then
+      SEARCH_START=$(echo "$LATEST_VERSION" | cut -d. -f3)
+      for i in $(seq -10 1 10); do
+        BUILD=$((SEARCH_START + i))
+        if [ $BUILD -le $CURRENT_BUILD ]; then
+          continue
+        fi
+        TEST_VERSION="1.1.$BUILD"
+        if curl -sf -I "$BASE_URL/Claude-darwin-universal-${TEST_VERSION}.dmg" >/dev/null 2>&1; then
+          LATEST_VERSION="$TEST_VERSION"
+        fi
+      done
+    fi
   fi
 
   # If no newer version found
@@ -130,9 +143,22 @@ fi
 # Extract DMG
 echo
 echo -e "${YELLOW}[2/7] Extracting DMG...${NC}"
-dmg2img Claude.dmg -o claude.img >/dev/null 2>&1
-7z x claude.img -o"$WORK_DIR/extracted" >/dev/null 2>&1
-echo -e "${GREEN}✓ Extracted${NC}"
+# Only pull the files we need straight out of the DMG; fall back to a full
+# dmg2img + 7z extraction for images dmg_tool.py can't read (LZFSE, APFS)
+RESOURCES="Claude.app/Contents/Resources"
+if [ -f "$DMG_TOOL" ] && python3 "$DMG_TOOL" extract Claude.dmg "$WORK_DIR/extracted/Claude" \
+    "$RESOURCES/app.asar" \
+    "$RESOURCES/app.asar.unpacked" \
+    "$RESOURCES/*.json" >/dev/null; then
+  echo -e "${GREEN}✓ Extracted (selective)${NC}"
+else
+  echo -e "${YELLOW}Selective extraction unavailable, extracting the full image...${NC}"
+  rm -rf "$WORK_DIR/extracted"
+  dmg2img Claude.dmg -o claude.img >/dev/null 2>&1
+  7z x claude.img -o"$WORK_DIR/extracted" >/dev/null 2>&1
+  rm -f claude.img
+  echo -e "${GREEN}✓ Extracted${NC}"
+fi
 
 # Extract app.asar
 echo
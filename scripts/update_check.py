@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Latest-version resolver for Claude Desktop
+
+Finds the newest published macOS DMG by sending concurrent HEAD requests
+for candidate build numbers. Each wave probes a dense window just above
+the newest known build, a strided span beyond it and a few galloping
+probes further out. When nothing past the dense window answers, the
+builds between the strides are probed too, so a lone release off the
+stride isn't missed; otherwise the next wave's dense window covers them.
+Results and ETags are cached in ~/.cache/claude-desktop so launching
+never has to wait on the network: the wrapper reads the cache and
+refreshes it in the background.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# asyncio, ssl and urllib are imported where they're used: `status` runs
+# on every launch and never touches the network
+
+
+DEFAULT_BASE_URL = ("https://storage.googleapis.com/"
+                    "osprey-downloads-c02f6a0d-347c-492b-a752-3e0651722e97/nest-mac-release")
+DMG_NAME = "Claude-darwin-universal-{version}.dmg"
+
+VERSION_FILE = "/opt/claude-desktop/version.txt"
+CACHE_FILE = os.path.expanduser("~/.cache/claude-desktop/update-check.json")
+
+# Builds probed one by one above the newest known build
+DENSE_WINDOW = 32
+# Every STRIDE-th build is probed from there up to SPAN
+STRIDE = 8
+SPAN = 256
+# Builds between the strides that are filled in when no stride answers
+GAP_FILL_SPAN = 128
+# Galloping probes at SPAN * 2**k beyond the newest known build
+GALLOP_STEPS = 3
+# Further waves are only needed when something beyond the dense window hits
+MAX_WAVES = 4
+
+# High enough that a whole wave is sent at once
+MAX_CONCURRENT = 64
+PROBE_TIMEOUT = 5
+
+
+def parse_version(version):
+    return tuple(int(part) for part in version.strip().split('.'))
+
+
+def format_version(prefix, build):
+    return '.'.join(str(part) for part in prefix + (build,))
+
+
+def read_current_version(path=VERSION_FILE):
+    try:
+        with open(path) as f:
+            return f.read().strip() or "1.1.0"
+    except OSError:
+        return "1.1.0"
+
+
+def load_cache(path=CACHE_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache, path=CACHE_FILE):
+    """Write the cache atomically so a concurrent reader never sees half a file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+async def head(url, etag=None, timeout=PROBE_TIMEOUT):
+    """Send a HEAD request and return (status, etag)"""
+    import asyncio
+    import ssl
+    from urllib.parse import urlsplit
+
+    parts = urlsplit(url)
+    https = parts.scheme == 'https'
+    port = parts.port or (443 if https else 80)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(parts.hostname, port,
+                                ssl=ssl.create_default_context() if https else None),
+        timeout)
+    try:
+        request = [
+            f"HEAD {path} HTTP/1.1",
+            f"Host: {parts.netloc}",
+            "User-Agent: claude-desktop-linux-update-check",
+            "Connection: close",
+        ]
+        if etag:
+            request.append(f"If-None-Match: {etag}")
+        writer.write(('\r\n'.join(request) + '\r\n\r\n').encode('latin-1'))
+        await writer.drain()
+
+        response = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout)
+    finally:
+        writer.close()
+
+    lines = response.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return status, headers.get('etag')
+
+
+class Resolver:
+    """Probes build numbers concurrently to find the newest available DMG"""
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, etags=None,
+                 max_concurrent=MAX_CONCURRENT, timeout=PROBE_TIMEOUT):
+        import asyncio
+
+        self.base_url = base_url.rstrip('/')
+        self.etags = dict(etags or {})
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+
+    def url_for(self, version):
+        return f"{self.base_url}/{DMG_NAME.format(version=version)}"
+
+    async def exists(self, version):
+        """Return True if the DMG for version is published"""
+        import asyncio
+
+        url = self.url_for(version)
+        async with self.semaphore:
+            try:
+                status, etag = await head(url, self.etags.get(url), self.timeout)
+            except (OSError, ValueError, IndexError, asyncio.TimeoutError,
+                    asyncio.IncompleteReadError):
+                return False
+
+        if status == 304:
+            return True
+        if 200 <= status < 300:
+            if etag:
+                self.etags[url] = etag
+            return True
+        self.etags.pop(url, None)
+        return False
+
+    async def _probe(self, prefix, builds):
+        """Return the builds that are published"""
+        import asyncio
+
+        found = await asyncio.gather(
+            *(self.exists(format_version(prefix, b)) for b in builds))
+        return [b for b, ok in zip(builds, found) if ok]
+
+    async def resolve(self, version):
+        """Return the newest published version at or above version"""
+        current = parse_version(version)
+        prefix, latest = current[:-1], current[-1]
+
+        for _ in range(MAX_WAVES):
+            candidates = list(range(latest + 1, latest + DENSE_WINDOW + 1))
+            candidates += range(latest + DENSE_WINDOW + STRIDE, latest + SPAN + 1, STRIDE)
+            candidates += [latest + SPAN * 2 ** k for k in range(1, GALLOP_STEPS + 1)]
+            window_end = latest + DENSE_WINDOW
+
+            hits = await self._probe(prefix, candidates)
+            if not any(b > window_end for b in hits):
+                # Nothing answered past the dense window, but a release may
+                # still sit between two strided probes
+                probed = set(candidates)
+                gaps = [b for b in range(window_end + 1, latest + GAP_FILL_SPAN + 1)
+                        if b not in probed]
+                hits += await self._probe(prefix, gaps)
+            if not hits:
+                break
+
+            latest = max(hits)
+            # Another wave is only worth it if something beyond the dense
+            # window answered; otherwise the window already covered the gap
+            if latest <= window_end:
+                break
+
+        return format_version(prefix, latest)
+
+
+def refresh(current_version, base_url=DEFAULT_BASE_URL, cache_path=CACHE_FILE):
+    """Probe for the latest version and update the cache"""
+    import asyncio
+
+    cache = load_cache(cache_path)
+    if cache.get('base_url') != base_url:
+        cache = {}
+
+    # Start from the newest build we already know about
+    start = current_version
+    cached_latest = cache.get('latest')
+    if cached_latest and parse_version(cached_latest) > parse_version(start):
+        start = cached_latest
+
+    async def run():
+        resolver = Resolver(base_url, cache.get('etags'))
+        if start == current_version:
+            return await resolver.resolve(start), resolver.etags
+
+        # Revalidate the cached build (usually a 304) alongside the wave,
+        # in case it has been withdrawn since
+        latest, still_published = await asyncio.gather(
+            resolver.resolve(start), resolver.exists(start))
+        if latest == start and not still_published:
+            latest = await resolver.resolve(current_version)
+        return latest, resolver.etags
+
+    latest, etags = asyncio.run(run())
+
+    # Only builds newer than the installed one are ever probed again
+    etags = {url: etag for url, etag in etags.items()
+             if parse_version(url.rsplit('-', 1)[1][:-len('.dmg')]) > parse_version(current_version)}
+
+    cache.update({
+        'base_url': base_url,
+        'checked_at': int(time.time()),
+        'latest': latest,
+        'etags': etags,
+    })
+    save_cache(cache, cache_path)
+    return latest
+
+
+def cached_latest(cache_path=CACHE_FILE):
+    """Return the latest version recorded by the last refresh, or None"""
+    return load_cache(cache_path).get('latest')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the latest Claude Desktop release")
+    parser.add_argument('command', choices=['refresh', 'status'],
+                        help="refresh: probe the server and update the cache; "
+                             "status: report the cached result without using the network")
+    parser.add_argument('--current', default=None,
+                        help=f"Installed version (default: read from {VERSION_FILE})")
+    parser.add_argument('--base-url',
+                        default=os.environ.get('CLAUDE_UPDATE_BASE_URL', DEFAULT_BASE_URL),
+                        help="Download location to probe (default: $CLAUDE_UPDATE_BASE_URL "
+                             "or the official bucket)")
+    parser.add_argument('--cache', default=CACHE_FILE, help="Cache file location")
+    args = parser.parse_args()
+
+    current = args.current or read_current_version()
+
+    if args.command == 'refresh':
+        latest = refresh(current, args.base_url, args.cache)
+    else:
+        latest = cached_latest(args.cache) or current
+        if parse_version(latest) < parse_version(current):
+            latest = current
+
+    print(latest)
+
+    # Exit status 0 means a newer version is available
+    sys.exit(0 if parse_version(latest) > parse_version(current) else 1)
+
+
+if __name__ == '__main__':
+    main()
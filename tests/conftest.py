@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The tools under test are standalone scripts, not an installed package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,218 @@
+"""
+Builds a small UDIF (UDZO) image holding an HFS+ volume laid out like the
+Claude DMG, for testing scripts/dmg_tool.py without a real download.
+
+Volume contents (relative to the volume root):
+
+    Claude.app/Contents/Resources/app.asar           fragmented data fork
+    Claude.app/Contents/Resources/en-US.json
+    Claude.app/Contents/Resources/app.asar.unpacked/native.node
+                                                     decmpfs (zlib, inline)
+    Claude.app/Contents/Resources/app.asar.unpacked/link -> native.node
+
+The catalog B-tree uses 8 KiB nodes on 4 KiB blocks, with its extents split
+so that nodes straddle a non-contiguous extent boundary.
+"""
+import plistlib
+import struct
+import zlib
+
+
+BLOCK_SIZE = 4096
+NODE_SIZE = 8192
+SECTORS_PER_CHUNK = 64
+
+RESOURCES = 'Claude.app/Contents/Resources'
+
+APP_ASAR = bytes(range(256)) * 3000 + b'tail'
+LOCALE_JSON = b'{"hello":"world"}'
+NATIVE_NODE = b'native module payload ' * 200
+
+
+def _name(name):
+    return struct.pack('>H', len(name)) + name.encode('utf-16-be')
+
+
+def _catalog_key(parent_id, name):
+    body = struct.pack('>I', parent_id) + _name(name)
+    return struct.pack('>H', len(body)) + body
+
+
+def _attribute_key(file_id, name):
+    body = struct.pack('>HII', 0, file_id, 0) + _name(name)
+    return struct.pack('>H', len(body)) + body
+
+
+def _fork(size, extents):
+    data = struct.pack('>QII', size, 0, sum(count for _, count in extents))
+    for start, count in extents:
+        data += struct.pack('>II', start, count)
+    return data + bytes(8 * (8 - len(extents)))
+
+
+def _bsd_info(mode, owner_flags=0):
+    return struct.pack('>IIBBHI', 0, 0, 0, owner_flags, mode, 0)
+
+
+def _folder_record(folder_id):
+    return struct.pack('>hHII', 1, 0, 0, folder_id) + bytes(20) + _bsd_info(0o40755) + bytes(40)
+
+
+def _file_record(file_id, data_fork, mode=0o100644, owner_flags=0):
+    return (struct.pack('>hHII', 2, 0, 0, file_id) + bytes(20) + _bsd_info(mode, owner_flags)
+            + bytes(40) + data_fork + _fork(0, []))
+
+
+def _node(kind, height, records, forward=0):
+    node = bytearray(NODE_SIZE)
+    struct.pack_into('>IIbBHH', node, 0, forward, 0, kind, height, len(records), 0)
+    offsets = []
+    offset = 14
+    for record in records:
+        offsets.append(offset)
+        node[offset:offset + len(record)] = record
+        offset += len(record)
+    offsets.append(offset)
+    for i, value in enumerate(offsets):
+        struct.pack_into('>H', node, NODE_SIZE - 2 * (i + 1), value)
+    return bytes(node)
+
+
+def _header_node(root, depth, total_nodes, max_key_length):
+    # Variable-length index keys and big keys, as on real HFS+ volumes
+    header = struct.pack('>HIIIIHHIIHIBBI', depth, root, 0, 0, 0, NODE_SIZE, max_key_length,
+                         total_nodes, 0, 0, 0, 0, 0, 6)
+    return _node(1, 0, [header + bytes(64), bytes(128)])
+
+
+class _Volume:
+    def __init__(self):
+        self.blocks = {}
+        self.next_block = 16
+
+    def allocate(self, data):
+        count = max(1, -(-len(data) // BLOCK_SIZE))
+        start = self.next_block
+        self.next_block += count
+        for i in range(count):
+            self.blocks[start + i] = data[i * BLOCK_SIZE:(i + 1) * BLOCK_SIZE]
+        return start, count
+
+    def allocate_split(self, data, first_blocks):
+        """Allocate data as two extents separated by a junk block"""
+        cut = first_blocks * BLOCK_SIZE
+        first = self.allocate(data[:cut])
+        self.allocate(b'\xAA' * BLOCK_SIZE)
+        second = self.allocate(data[cut:])
+        return [first, second]
+
+
+def build_volume(extra_names=()):
+    """Return the raw bytes of the HFS+ volume
+
+    extra_names adds empty files with those (possibly hostile) names to
+    app.asar.unpacked.
+    """
+    volume = _Volume()
+
+    asar_fork = _fork(len(APP_ASAR), volume.allocate_split(APP_ASAR, 100))
+    json_fork = _fork(len(LOCALE_JSON), [volume.allocate(LOCALE_JSON)])
+    link_target = b'native.node'
+    link_fork = _fork(len(link_target), [volume.allocate(link_target)])
+
+    records = [
+        (1, 'Claude', _folder_record(2)),
+        (2, 'Claude.app', _folder_record(16)),
+        (16, 'Contents', _folder_record(17)),
+        (17, 'Resources', _folder_record(18)),
+        (18, 'app.asar', _file_record(20, asar_fork)),
+        (18, 'app.asar.unpacked', _folder_record(19)),
+        (18, 'en-US.json', _file_record(21, json_fork)),
+        *((19, name, _file_record(30 + i, _fork(0, [])))
+          for i, name in enumerate(extra_names)),
+        (19, 'link', _file_record(22, link_fork, mode=0o120755)),
+        (19, 'native.node', _file_record(23, _fork(0, []), owner_flags=0x20)),
+    ]
+    leaves = [_catalog_key(parent, name) + data for parent, name, data in records]
+    index = [
+        _catalog_key(1, 'Claude') + struct.pack('>I', 1),
+        _catalog_key(18, 'app.asar') + struct.pack('>I', 2),
+    ]
+    catalog = (_header_node(3, 2, 4, 516)
+               + _node(-1, 1, leaves[:4], forward=2)
+               + _node(-1, 1, leaves[4:])
+               + _node(0, 2, index))
+
+    decmpfs = (b'fpmc' + struct.pack('<IQ', 3, len(NATIVE_NODE))
+               + zlib.compress(NATIVE_NODE))
+    attribute = (_attribute_key(23, 'com.apple.decmpfs')
+                 + struct.pack('>IIII', 0x10, 0, 0, len(decmpfs)) + decmpfs)
+    attributes = _header_node(1, 1, 2, 266) + _node(-1, 1, [attribute])
+
+    # Split mid-way through the first leaf node so it straddles the gap
+    catalog_extents = volume.allocate_split(catalog, 3)
+    attributes_extents = [volume.allocate(attributes)]
+
+    total_blocks = volume.next_block + 4
+    header = bytearray(512)
+    header[0:2] = b'H+'
+    struct.pack_into('>H', header, 2, 4)
+    struct.pack_into('>II', header, 40, BLOCK_SIZE, total_blocks)
+    header[272:352] = _fork(len(catalog), catalog_extents)
+    header[352:432] = _fork(len(attributes), attributes_extents)
+
+    image = bytearray(total_blocks * BLOCK_SIZE)
+    image[1024:1536] = header
+    for block, data in volume.blocks.items():
+        image[block * BLOCK_SIZE:block * BLOCK_SIZE + len(data)] = data
+    return bytes(image)
+
+
+def _mish(first_sector, sector_count, chunks):
+    table = (b'mish' + struct.pack('>IQQQII', 1, first_sector, sector_count, 0, 0, 0)
+             + bytes(24) + struct.pack('>II', 0, 0) + bytes(128)
+             + struct.pack('>I', len(chunks) + 1))
+    for entry_type, sector, count, offset, length in chunks:
+        table += struct.pack('>IIQQQQ', entry_type, 0, sector, count, offset, length)
+    return table + struct.pack('>IIQQQQ', 0xFFFFFFFF, 0, sector_count, 0, 0, 0)
+
+
+def build_dmg(path, extra_names=()):
+    """Write the fixture image to path"""
+    volume = build_volume(extra_names)
+    data = bytearray()
+
+    def add(entry_type, sector, count, payload):
+        chunks.append((entry_type, sector, count, len(data), len(payload)))
+        data.extend(payload)
+
+    # A small raw "partition map" ahead of the HFS+ partition
+    chunks = []
+    add(0x00000001, 0, 64, bytes(64 * 512))
+    partition_map = _mish(0, 64, chunks)
+
+    chunks = []
+    sector_count = len(volume) // 512
+    for sector in range(0, sector_count, SECTORS_PER_CHUNK):
+        piece = volume[sector * 512:(sector + SECTORS_PER_CHUNK) * 512]
+        count = len(piece) // 512
+        if not piece.strip(b'\x00'):
+            chunks.append((0x00000002, sector, count, len(data), 0))
+        else:
+            add(0x80000005, sector, count, zlib.compress(piece))
+    hfs = _mish(64, sector_count, chunks)
+
+    plist = plistlib.dumps({'resource-fork': {'blkx': [
+        {'Name': 'Driver Descriptor Map (DDM : 0)', 'ID': '-1', 'Attributes': '0x0050',
+         'Data': partition_map},
+        {'Name': 'Claude (Apple_HFS : 1)', 'CFName': 'Claude (Apple_HFS : 1)', 'ID': '0',
+         'Attributes': '0x0050', 'Data': hfs},
+    ]}})
+
+    koly = bytearray(512)
+    koly[0:4] = b'koly'
+    struct.pack_into('>IIIQQQ', koly, 4, 4, 512, 1, 0, 0, len(data))
+    struct.pack_into('>QQ', koly, 216, len(data), len(plist))
+
+    with open(path, 'wb') as f:
+        f.write(bytes(data) + plist + bytes(koly))
@@ -0,0 +1,193 @@
+import hashlib
+import io
+import json
+import os
+import struct
+import subprocess
+import sys
+
+import pytest
+
+import asar_tool
+
+
+ASAR_TOOL = os.path.join(os.path.dirname(asar_tool.__file__), 'asar_tool.py')
+
+# Appends "<start> <end>" to a log so tests can see which jobs overlapped
+RECORD_SPAN = """
+import sys, time
+start = time.time()
+time.sleep(0.3)
+with open(sys.argv[1], 'a') as f:
+    f.write(f"{start} {time.time()}\\n")
+"""
+
+
+def write_asar(path, header, data):
+    """Write an archive with an arbitrary header"""
+    header_json = json.dumps(header).encode('utf-8') + b'\x00'
+    padding = (4 - (len(header_json) + 8) % 4) % 4
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<IIII', 4, len(header_json) + padding + 8, len(header_json), 0))
+        f.write(header_json + b'\x00' * padding + data)
+
+
+def make_asar(path, files):
+    """Write an archive with integrity hashes for a {name: bytes} dict"""
+    header = {'files': {}}
+    data = b''
+    for name, content in files.items():
+        header['files'][name] = {
+            'size': len(content),
+            'offset': str(len(data)),
+            'integrity': {'algorithm': 'SHA256', 'hash': hashlib.sha256(content).hexdigest()},
+        }
+        data += content
+    write_asar(path, header, data)
+    return header, data
+
+
+def run(manifest):
+    return asar_tool.run_batch(manifest, progress=io.StringIO())
+
+
+def test_verify_checks_integrity_and_bounds(tmp_path):
+    path = str(tmp_path / 'app.asar')
+    header, data = make_asar(path, {'a.js': b'one', 'b.js': b'two'})
+    assert asar_tool.verify_asar(path) == (2, 2)
+
+    header['files']['b.js']['integrity']['hash'] = hashlib.sha256(b'other').hexdigest()
+    write_asar(path, header, data)
+    with pytest.raises(ValueError, match='b.js: integrity hash mismatch'):
+        asar_tool.verify_asar(path)
+
+    header, data = make_asar(path, {'a.js': b'one'})
+    header['files']['a.js']['size'] = 4096
+    write_asar(path, header, data)
+    with pytest.raises(ValueError, match='a.js: data extends past end of archive'):
+        asar_tool.verify_asar(path)
+
+
+def test_transform_keeps_unpacked_and_link_entries(tmp_path):
+    archive = str(tmp_path / 'app.asar')
+    header = {'files': {
+        'main.js': {'size': 3, 'offset': '0'},
+        'lib': {'files': {'native.node': {'size': 6, 'unpacked': True}}},
+        'current': {'link': 'main.js'},
+    }}
+    write_asar(archive, header, b'old')
+    os.makedirs(tmp_path / 'app.asar.unpacked' / 'lib')
+    (tmp_path / 'app.asar.unpacked' / 'lib' / 'native.node').write_bytes(b'binary')
+
+    output = str(tmp_path / 'out' / 'patched.asar')
+    os.makedirs(os.path.dirname(output))
+    asar_tool.transform_asar(archive, output, [['sh', '-c', 'echo -n new > {dir}/main.js']])
+
+    with open(output, 'rb') as f:
+        new_header, base_offset = asar_tool.read_asar_header(f)
+        f.seek(base_offset)
+        assert f.read() == b'new'
+    assert new_header['files']['lib']['files']['native.node'] == {'size': 6, 'unpacked': True}
+    assert new_header['files']['current'] == {'link': 'main.js'}
+    assert (tmp_path / 'out' / 'patched.asar.unpacked' / 'lib' / 'native.node').read_bytes() == b'binary'
+    assert asar_tool.verify_asar(output) == (1, 0)
+
+
+def test_batch_caps_jobs_per_device(tmp_path):
+    log = tmp_path / 'spans.log'
+    jobs = []
+    for i in range(6):
+        archive = str(tmp_path / f'in{i}.asar')
+        make_asar(archive, {'a.js': b'x'})
+        jobs.append({'op': 'transform', 'archive': archive, 'output': str(tmp_path / f'out{i}.asar'),
+                     'commands': [[sys.executable, '-c', RECORD_SPAN, str(log)]]})
+
+    summary = run({'workers': 6, 'per_device': 2, 'jobs': jobs})
+    assert summary['failed'] == 0
+
+    # Every job is on the same st_dev, so at most two may overlap
+    spans = [tuple(map(float, line.split())) for line in log.read_text().splitlines()]
+    assert len(spans) == 6
+    overlap = max(sum(1 for s, e in spans if s <= start < e) for start, _ in spans)
+    assert overlap == 2
+
+
+def test_batch_reports_malformed_jobs(tmp_path):
+    archive = str(tmp_path / 'app.asar')
+    make_asar(archive, {'a.js': b'x'})
+    summary = run({'jobs': [
+        'not a job',
+        {'op': 'explode', 'archive': archive},
+        {'op': 'list'},
+        {'op': 'verify', 'archive': archive},
+    ]})
+
+    assert [job['status'] for job in summary['jobs']] == ['error', 'error', 'error', 'ok']
+    assert summary['jobs'][0]['error'].startswith('Invalid job')
+    assert summary['jobs'][1]['error'] == 'Unknown op: explode'
+    assert summary['jobs'][2]['error'] == 'Missing archive for list'
+    assert (summary['total'], summary['succeeded'], summary['failed']) == (4, 1, 3)
+
+
+@pytest.mark.parametrize('settings', [
+    {'per_device': 0}, {'per_device': -1}, {'workers': 0}, {'workers': [2]}, {'workers': 'many'},
+])
+def test_batch_rejects_bad_settings(settings):
+    with pytest.raises(ValueError):
+        run(dict(settings, jobs=[]))
+
+
+def test_batch_survives_a_dying_worker(tmp_path, monkeypatch):
+    archive = str(tmp_path / 'app.asar')
+    make_asar(archive, {'a.js': b'x'})
+    run_job = asar_tool.run_job
+
+    def crashing_run_job(job):
+        if job['op'] == 'list':
+            os._exit(9)
+        return run_job(job)
+
+    # Worker processes are forked, so they pick up the patched function
+    monkeypatch.setattr(asar_tool, 'run_job', crashing_run_job)
+    summary = run({'workers': 1, 'jobs': [
+        {'op': 'list', 'archive': archive},
+        {'op': 'verify', 'archive': archive},
+    ]})
+
+    assert summary['total'] == 2
+    assert summary['failed'] == 2
+    assert summary['jobs'][0]['error'] == 'Worker process died unexpectedly'
+    assert summary['jobs'][1]['error'] in ('Worker process died unexpectedly',
+                                          'Not run: the worker pool stopped')
+
+
+def test_batch_command_exit_status_and_summary(tmp_path):
+    archive = tmp_path / 'app.asar'
+    make_asar(str(archive), {'a.js': b'x'})
+    manifest = tmp_path / 'manifest.json'
+
+    manifest.write_text(json.dumps({'jobs': [{'op': 'verify', 'archive': 'app.asar'}]}))
+    result = subprocess.run([sys.executable, ASAR_TOOL, 'batch', str(manifest)],
+                            capture_output=True, text=True)
+    assert result.returncode == 0
+    summary = json.loads(result.stdout)
+    assert set(summary) == {'total', 'succeeded', 'failed', 'workers', 'per_device',
+                            'elapsed', 'jobs'}
+    assert summary['jobs'] == [{
+        'index': 0, 'op': 'verify', 'archive': str(archive), 'status': 'ok',
+        'elapsed': summary['jobs'][0]['elapsed'],
+        'result': {'files': 1, 'integrity_checked': 1},
+    }]
+
+    manifest.write_text(json.dumps({'jobs': [{'op': 'verify', 'archive': 'missing.asar'}]}))
+    result = subprocess.run([sys.executable, ASAR_TOOL, 'batch', str(manifest)],
+                            capture_output=True, text=True)
+    assert result.returncode == 1
+    assert json.loads(result.stdout)['failed'] == 1
+
+    manifest.write_text(json.dumps({'per_device': 0, 'jobs': []}))
+    result = subprocess.run([sys.executable, ASAR_TOOL, 'batch', str(manifest)],
+                            capture_output=True, text=True)
+    assert result.returncode == 1
+    assert result.stdout == ''
+    assert 'per_device must be at least 1' in result.stderr
@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+import dmg_fixture
+import dmg_tool
+from dmg_fixture import RESOURCES
+
+
+@pytest.fixture
+def dmg_path(tmp_path):
+    path = tmp_path / 'Claude.dmg'
+    dmg_fixture.build_dmg(str(path))
+    return str(path)
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_extract_matches_source_files(dmg_path, tmp_path):
+    out = tmp_path / 'out'
+    dmg_tool.extract_dmg(dmg_path, str(out), [
+        f'{RESOURCES}/app.asar',
+        f'{RESOURCES}/app.asar.unpacked',
+        f'{RESOURCES}/*.json',
+    ])
+
+    resources = out / RESOURCES
+    assert read(resources / 'app.asar') == dmg_fixture.APP_ASAR
+    assert read(resources / 'en-US.json') == dmg_fixture.LOCALE_JSON
+    assert read(resources / 'app.asar.unpacked' / 'native.node') == dmg_fixture.NATIVE_NODE
+    assert os.readlink(resources / 'app.asar.unpacked' / 'link') == 'native.node'
+
+
+def test_slash_in_name_is_mapped_to_colon(tmp_path):
+    dmg_path = str(tmp_path / 'Claude.dmg')
+    dmg_fixture.build_dmg(dmg_path, extra_names=['../../escape', 'a/b'])
+    out = tmp_path / 'out'
+    dmg_tool.extract_dmg(dmg_path, str(out), [f'{RESOURCES}/app.asar.unpacked'])
+
+    unpacked = out / RESOURCES / 'app.asar.unpacked'
+    assert sorted(os.listdir(unpacked)) == ['..:..:escape', 'a:b', 'link', 'native.node']
+    assert sorted(os.listdir(tmp_path)) == ['Claude.dmg', 'out']
+
+
+@pytest.mark.parametrize('name', ['..', '.', '', 'bad\x00name'])
+def test_unsafe_names_are_refused(tmp_path, name):
+    dmg_path = str(tmp_path / 'Claude.dmg')
+    dmg_fixture.build_dmg(dmg_path, extra_names=[name])
+    out = tmp_path / 'out'
+    with pytest.raises(dmg_tool.DMGError, match='Unsafe file name'):
+        dmg_tool.extract_dmg(dmg_path, str(out), [f'{RESOURCES}/app.asar.unpacked'])
+    assert sorted(os.listdir(tmp_path)) == ['Claude.dmg', 'out']
+
+
+def test_only_needed_chunks_are_inflated(dmg_path):
+    image, volume = dmg_tool.open_volume(dmg_path)
+    with image:
+        inflated = set()
+        chunk_data = image._chunk_data
+
+        def tracking_chunk_data(index):
+            inflated.add(index)
+            return chunk_data(index)
+
+        image._chunk_data = tracking_chunk_data
+        record = volume.lookup(f'{RESOURCES}/en-US.json')
+        assert b''.join(volume.iter_file_chunks(record)) == dmg_fixture.LOCALE_JSON
+
+        # Catalog/attributes metadata plus the one file, not app.asar's chunks
+        assert 0 < len(inflated) < len(image.chunks) // 2
+
+
+def test_lookup_missing_path(dmg_path):
+    image, volume = dmg_tool.open_volume(dmg_path)
+    with image:
+        with pytest.raises(FileNotFoundError):
+            volume.lookup(f'{RESOURCES}/missing.asar')
+
+
+def test_not_a_dmg(tmp_path):
+    path = tmp_path / 'plain.bin'
+    path.write_bytes(b'\x00' * 4096)
+    with pytest.raises(dmg_tool.DMGError):
+        dmg_tool.open_volume(str(path))
+
+
+def test_adc_decompress():
+    # Literal "abc", then a 4-byte back reference 3 bytes back
+    assert dmg_tool.adc_decompress(bytes([0x82]) + b'abc' + bytes([0x04, 0x02])) == b'abcabca'
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import update_check
+
+
+class StubServer(ThreadingHTTPServer):
+    # A whole probe wave arrives at once
+    request_queue_size = 256
+    daemon_threads = True
+
+    def __init__(self, builds):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.builds = set(builds)
+        self.log = []
+        self.lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_HEAD(self):
+        name = self.path.rsplit('/', 1)[-1]
+        build = None
+        if name.startswith('Claude-darwin-universal-') and name.endswith('.dmg'):
+            build = int(name[:-len('.dmg')].rsplit('.', 1)[1])
+
+        etag = f'"etag-{build}"'
+        if build not in self.server.builds:
+            status = 404
+        elif self.headers.get('If-None-Match') == etag:
+            status = 304
+        else:
+            status = 200
+        with self.server.lock:
+            self.server.log.append((build, status))
+
+        self.send_response(status)
+        if status != 404:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(builds):
+        server = StubServer(builds)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, f'http://127.0.0.1:{server.server_address[1]}/bucket'
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_resolve_finds_latest_build(stub):
+    # 1.1.300 is only reachable through the strided probes of a second wave
+    _, base_url = stub({101, 105, 140, 180, 300})
+    resolver = update_check.Resolver(base_url)
+    assert asyncio.run(resolver.resolve('1.1.100')) == '1.1.300'
+    assert resolver.etags[resolver.url_for('1.1.300')] == '"etag-300"'
+
+
+@pytest.mark.parametrize('builds, latest', [
+    ({150}, 150),          # lone release between two strided probes
+    ({105, 150}, 150),     # dense-window hit plus an off-stride release
+    ({101, 227}, 227),     # at the far end of the gap fill
+    ({135, 251}, 251),     # gap hit, then the next wave's gap fill
+])
+def test_resolve_finds_off_stride_builds(stub, builds, latest):
+    _, base_url = stub(builds)
+    resolver = update_check.Resolver(base_url)
+    assert asyncio.run(resolver.resolve('1.1.100')) == f'1.1.{latest}'
+
+
+def test_resolve_without_newer_builds(stub):
+    _, base_url = stub({90, 100})
+    assert asyncio.run(update_check.Resolver(base_url).resolve('1.1.100')) == '1.1.100'
+
+
+def test_refresh_caches_result_and_revalidates_etags(stub, tmp_path):
+    server, base_url = stub({101, 120})
+    cache_path = str(tmp_path / 'update-check.json')
+
+    assert update_check.refresh('1.1.100', base_url, cache_path) == '1.1.120'
+    with open(cache_path) as f:
+        cache = json.load(f)
+    assert cache['base_url'] == base_url
+    assert cache['latest'] == '1.1.120'
+    assert cache['etags'] == {
+        f'{base_url}/Claude-darwin-universal-1.1.101.dmg': '"etag-101"',
+        f'{base_url}/Claude-darwin-universal-1.1.120.dmg': '"etag-120"',
+    }
+    assert update_check.cached_latest(cache_path) == '1.1.120'
+
+    # The next refresh starts from the cached build and revalidates its ETag
+    server.log.clear()
+    server.builds.add(125)
+    assert update_check.refresh('1.1.100', base_url, cache_path) == '1.1.125'
+    assert (125, 200) in server.log
+    assert all(build >= 120 for build, _ in server.log)
+    assert (120, 304) in server.log
+
+    # Once installed, older builds are dropped from the cache
+    server.log.clear()
+    assert update_check.refresh('1.1.120', base_url, cache_path) == '1.1.125'
+    assert (125, 304) in server.log
+    with open(cache_path) as f:
+        etags = json.load(f)['etags']
+    assert list(etags) == [f'{base_url}/Claude-darwin-universal-1.1.125.dmg']
+
+
+def test_refresh_falls_back_when_cached_build_is_withdrawn(stub, tmp_path):
+    server, base_url = stub({101, 120})
+    cache_path = str(tmp_path / 'update-check.json')
+    assert update_check.refresh('1.1.100', base_url, cache_path) == '1.1.120'
+
+    server.builds.discard(120)
+    assert update_check.refresh('1.1.100', base_url, cache_path) == '1.1.101'
+    assert update_check.cached_latest(cache_path) == '1.1.101'
+
+
+def test_refresh_ignores_cache_for_other_base_url(stub, tmp_path):
+    _, base_url = stub({101})
+    cache_path = str(tmp_path / 'update-check.json')
+    update_check.save_cache({'base_url': 'http://elsewhere', 'latest': '1.1.500',
+                             'etags': {'http://elsewhere/x': '"old"'}}, cache_path)
+
+    assert update_check.refresh('1.1.100', base_url, cache_path) == '1.1.101'
+    with open(cache_path) as f:
+        cache = json.load(f)
+    assert cache['base_url'] == base_url
+    assert 'http://elsewhere/x' not in cache['etags']
+
+
+def test_unreachable_server_keeps_current_version(tmp_path):
+    cache_path = str(tmp_path / 'update-check.json')
+    assert update_check.refresh('1.1.100', 'http://127.0.0.1:9/bucket', cache_path) == '1.1.100'
+    assert update_check.cached_latest(cache_path) == '1.1.100'